@@ -0,0 +1,163 @@
+#!/usr/bin/env node
+/**
+ * Shared Browser Server
+ *
+ * Started detached by helpers.connectSharedBrowser(). Keeps one Chromium
+ * running and records its WebSocket endpoint in a lockfile so later script
+ * runs can connect to it instead of launching their own browser.
+ *
+ * Connected scripts register themselves in a clients directory next to the
+ * lockfile. The server stops itself once no live client has been registered
+ * for PW_SHARED_BROWSER_IDLE_MS (default 10 minutes, 0 disables).
+ *
+ * Usage: node lib/browser-server.js <lockfile> [launchOptionsJson]
+ */
+
+const fs = require('fs');
+const path = require('path');
+
+/**
+ * Check whether a process exists
+ * @param {number} pid - Process ID
+ * @returns {boolean} True if the process is running
+ */
+function isProcessAlive(pid) {
+  try {
+    process.kill(pid, 0);
+    return true;
+  } catch (e) {
+    // EPERM: the process exists but belongs to another user
+    return e.code === 'EPERM';
+  }
+}
+
+/**
+ * Directory where connected clients register, one file per connection named <pid>-<n>
+ * @param {string} lockFile - Path of the shared browser lockfile
+ * @returns {string} Clients directory
+ */
+function getClientsDir(lockFile) {
+  return `${lockFile}.clients`;
+}
+
+/**
+ * Count registered clients whose process is still running, pruning dead ones
+ * @param {string} clientsDir - Clients directory
+ * @returns {number} Number of live clients
+ */
+function countLiveClients(clientsDir) {
+  let entries = [];
+  try {
+    entries = fs.readdirSync(clientsDir);
+  } catch (e) {
+    return 0;
+  }
+
+  let live = 0;
+  for (const name of entries) {
+    if (isProcessAlive(parseInt(name, 10))) {
+      live++;
+    } else {
+      try {
+        fs.unlinkSync(path.join(clientsDir, name));
+      } catch (e) {
+        // Already removed by its client
+      }
+    }
+  }
+  return live;
+}
+
+/**
+ * Check whether the lockfile belongs to another running server
+ * @param {string} lockFile - Path of the shared browser lockfile
+ * @returns {boolean} True if a different, live process holds the lock
+ */
+function isLockHeldByLiveServer(lockFile) {
+  try {
+    const { pid } = JSON.parse(fs.readFileSync(lockFile, 'utf8'));
+    return pid !== process.pid && isProcessAlive(pid);
+  } catch (e) {
+    return false;
+  }
+}
+
+async function main() {
+  const { chromium } = require('playwright');
+  const [lockFile, optionsJson] = process.argv.slice(2);
+  const options = optionsJson ? JSON.parse(optionsJson) : {};
+
+  // Never run alongside a live server: its lockfile would be overwritten and
+  // one of the two browsers could no longer be found or stopped
+  if (isLockHeldByLiveServer(lockFile)) {
+    console.error('Shared browser server already running');
+    process.exit(0);
+  }
+
+  const server = await chromium.launchServer(options);
+
+  // Registrations left over from a previous server are meaningless now
+  const clientsDir = getClientsDir(lockFile);
+  fs.rmSync(clientsDir, { recursive: true, force: true });
+
+  const removeLock = () => {
+    try {
+      const lock = JSON.parse(fs.readFileSync(lockFile, 'utf8'));
+      if (lock.pid === process.pid) {
+        fs.unlinkSync(lockFile);
+      }
+    } catch (e) {
+      // Lockfile already gone or replaced
+    }
+  };
+
+  const shutdown = async () => {
+    removeLock();
+    await server.close();
+    process.exit(0);
+  };
+
+  process.on('SIGTERM', shutdown);
+  process.on('SIGINT', shutdown);
+
+  // Stop on our own if scripts forget closeSharedBrowser(), rather than leaving
+  // a (possibly visible) browser running indefinitely
+  const idleTimeoutEnv = parseInt(process.env.PW_SHARED_BROWSER_IDLE_MS, 10);
+  const idleTimeout = Number.isFinite(idleTimeoutEnv) ? idleTimeoutEnv : 10 * 60 * 1000;
+  if (idleTimeout > 0) {
+    let idleSince = Date.now();
+    setInterval(() => {
+      if (countLiveClients(clientsDir) > 0) {
+        idleSince = Date.now();
+      } else if (Date.now() - idleSince >= idleTimeout) {
+        shutdown();
+      }
+    }, Math.min(idleTimeout, 30000));
+  }
+
+  // Browser closed or crashed on its own - don't leave a dangling lockfile
+  server.process().once('exit', () => {
+    removeLock();
+    process.exit(0);
+  });
+
+  fs.mkdirSync(path.dirname(lockFile), { recursive: true });
+  fs.writeFileSync(
+    lockFile,
+    JSON.stringify({ pid: process.pid, wsEndpoint: server.wsEndpoint(), launchOptions: options }),
+    'utf8'
+  );
+}
+
+// Lock helpers are shared with lib/helpers.js; only run the server when executed directly
+if (require.main === module) {
+  main().catch(error => {
+    console.error('❌ Failed to start shared browser:', error.message);
+    process.exit(1);
+  });
+}
+
+module.exports = {
+  isProcessAlive,
+  getClientsDir
+};
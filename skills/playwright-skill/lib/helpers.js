@@ -1,7 +1,77 @@
 // playwright-helpers.js
 // Reusable utility functions for Playwright automation
 
-const { chromium, firefox, webkit } = require('playwright');
+const dns = require('dns');
+const fs = require('fs');
+const net = require('net');
+const os = require('os');
+const path = require('path');
+const { isProcessAlive, getClientsDir } = require('./browser-server');
+
+// Playwright itself is required lazily in launchBrowser() so that lightweight
+// helpers such as detectDevServers() don't pay its load cost
+
+// Browser engines accepted by launchBrowser()
+const BROWSER_TYPES = ['chromium', 'firefox', 'webkit'];
+
+// Lockfile describing the shared browser server started by connectSharedBrowser()
+const SHARED_BROWSER_LOCK = path.join(os.homedir(), '.cache', 'playwright-skill', 'browser.json');
+
+// Per-process counter for shared browser client registrations
+let sharedBrowserClientCount = 0;
+
+// Idle contexts handed back via releaseContext(), oldest first
+const contextPool = [];
+// Pool key and creation options of each context created by createContext()
+const contextPoolInfo = new WeakMap();
+const contextPoolSize = parseInt(process.env.PW_CONTEXT_POOL, 10);
+const CONTEXT_POOL_MAX = Number.isFinite(contextPoolSize) ? contextPoolSize : 4;
+
+// Login form selectors used by authenticate() unless overridden
+const DEFAULT_AUTH_SELECTORS = {
+  username: 'input[name="username"], input[name="email"], #username, #email',
+  password: 'input[name="password"], #password',
+  submit: 'button[type="submit"], input[type="submit"], button:has-text("Login"), button:has-text("Sign in")'
+};
+
+// Base options for createContext(), overridden by anything the caller passes
+const DEFAULT_CONTEXT_OPTIONS = {
+  viewport: { width: 1280, height: 720 },
+  permissions: [],
+  locale: 'en-US',
+  timezoneId: 'America/New_York'
+};
+
+// User agent for createContext({ mobile: true })
+const MOBILE_USER_AGENT = 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_7_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.2 Mobile/15E148 Safari/604.1';
+
+// Common cookie consent buttons, in order of preference. "OK" is matched exactly
+// since :has-text() would also hit buttons like "Book now" or "Cookie settings".
+const COOKIE_BANNER_SELECTORS = [
+  'button:has-text("Accept")',
+  'button:has-text("Accept all")',
+  'button:text-is("OK")',
+  'button:has-text("Got it")',
+  'button:has-text("I agree")',
+  '.cookie-accept',
+  '#cookie-accept',
+  '[data-testid="cookie-accept"]'
+];
+
+// All candidates as one selector list, used to wait for any of them at once
+const COOKIE_BANNER_SELECTOR = COOKIE_BANNER_SELECTORS.join(', ');
+
+// Common dev server ports checked by detectDevServers()
+const COMMON_DEV_PORTS = [3000, 3001, 3002, 5173, 8080, 8000, 4200, 5000, 9000, 1234];
+
+// Cached loopback addresses, see resolveLocalhost()
+let localhostAddresses = null;
+
+// Per-process sequence number appended to takeScreenshot() filenames
+let screenshotCounter = 0;
+
+// Last parsed headers, keyed on the raw env values they were parsed from
+let extraHeadersCache = null;
 
 /**
  * Parse extra HTTP headers from environment variables.
@@ -9,22 +79,45 @@ const { chromium, firefox, webkit } = require('playwright');
  * - PW_HEADER_NAME + PW_HEADER_VALUE: Single header (simple, common case)
  * - PW_EXTRA_HEADERS: JSON object for multiple headers (advanced)
  * Single header format takes precedence if both are set.
- * @returns {Object|null} Headers object or null if none configured
+ * The result is cached until one of the variables changes.
+ * @returns {Object|null} Frozen headers object or null if none configured
  */
 function getExtraHeadersFromEnv() {
   const headerName = process.env.PW_HEADER_NAME;
   const headerValue = process.env.PW_HEADER_VALUE;
+  const headersJson = process.env.PW_EXTRA_HEADERS;
+
+  if (
+    extraHeadersCache &&
+    extraHeadersCache.headerName === headerName &&
+    extraHeadersCache.headerValue === headerValue &&
+    extraHeadersCache.headersJson === headersJson
+  ) {
+    return extraHeadersCache.headers;
+  }
+
+  const headers = parseExtraHeaders(headerName, headerValue, headersJson);
+  extraHeadersCache = { headerName, headerValue, headersJson, headers };
+  return headers;
+}
 
+/**
+ * Build the extra headers object from raw env values
+ * @param {string|undefined} headerName - PW_HEADER_NAME
+ * @param {string|undefined} headerValue - PW_HEADER_VALUE
+ * @param {string|undefined} headersJson - PW_EXTRA_HEADERS
+ * @returns {Object|null} Frozen headers object or null if none configured
+ */
+function parseExtraHeaders(headerName, headerValue, headersJson) {
   if (headerName && headerValue) {
-    return { [headerName]: headerValue };
+    return Object.freeze({ [headerName]: headerValue });
   }
 
-  const headersJson = process.env.PW_EXTRA_HEADERS;
   if (headersJson) {
     try {
       const parsed = JSON.parse(headersJson);
       if (typeof parsed === 'object' && parsed !== null && !Array.isArray(parsed)) {
-        return parsed;
+        return Object.freeze(parsed);
       }
       console.warn('PW_EXTRA_HEADERS must be a JSON object, ignoring...');
     } catch (e) {
@@ -36,25 +129,249 @@ function getExtraHeadersFromEnv() {
 }
 
 /**
- * Launch browser with standard configuration
- * @param {string} browserType - 'chromium', 'firefox', or 'webkit'
- * @param {Object} options - Additional launch options
+ * Standard browser launch options, honouring HEADLESS and SLOW_MO
+ * @returns {Object} Launch options
  */
-async function launchBrowser(browserType = 'chromium', options = {}) {
-  const defaultOptions = {
+function getDefaultLaunchOptions() {
+  return {
     headless: process.env.HEADLESS !== 'false',
     slowMo: process.env.SLOW_MO ? parseInt(process.env.SLOW_MO) : 0,
     args: ['--no-sandbox', '--disable-setuid-sandbox']
   };
-  
-  const browsers = { chromium, firefox, webkit };
-  const browser = browsers[browserType];
-  
-  if (!browser) {
+}
+
+/**
+ * Launch browser with standard configuration
+ * @param {string} browserType - 'chromium', 'firefox', or 'webkit'
+ * @param {Object} options - Additional launch options
+ */
+async function launchBrowser(browserType = 'chromium', options = {}) {
+  // Validate before loading Playwright so a typo fails fast
+  if (!BROWSER_TYPES.includes(browserType)) {
     throw new Error(`Invalid browser type: ${browserType}`);
   }
   
-  return await browser.launch({ ...defaultOptions, ...options });
+  const browser = require('playwright')[browserType];
+  return await browser.launch({ ...getDefaultLaunchOptions(), ...options });
+}
+
+/**
+ * Read the shared browser lockfile
+ * @returns {Object|null} { pid, wsEndpoint } if the server process is still alive, else null
+ */
+function readSharedBrowserLock() {
+  try {
+    const lock = JSON.parse(fs.readFileSync(SHARED_BROWSER_LOCK, 'utf8'));
+    return isProcessAlive(lock.pid) ? lock : null;
+  } catch (e) {
+    return null;
+  }
+}
+
+/**
+ * Try to become the one process that starts the shared browser server
+ * @param {string} startLock - Path of the exclusive start lockfile
+ * @returns {boolean} True if this process now holds the start lock
+ */
+function tryAcquireStartLock(startLock) {
+  try {
+    fs.writeFileSync(startLock, String(process.pid), { flag: 'wx' });
+    return true;
+  } catch (e) {
+    if (e.code !== 'EEXIST') {
+      throw e;
+    }
+  }
+
+  // Take over the lock if its holder died without releasing it. An empty file
+  // means the holder is between creating and writing it, unless it is old.
+  try {
+    const pid = parseInt(fs.readFileSync(startLock, 'utf8'), 10);
+    const abandoned = Number.isFinite(pid)
+      ? !isProcessAlive(pid)
+      : Date.now() - fs.statSync(startLock).mtimeMs > 5000;
+    if (abandoned) {
+      fs.unlinkSync(startLock);
+    }
+  } catch (e) {
+    // Released by its holder in the meantime
+  }
+
+  return false;
+}
+
+/**
+ * Start a detached shared Chromium server and wait for its endpoint.
+ * Startup is serialised across processes, so concurrent first runs share one server.
+ * @param {Object} options - Launch options for the server
+ * @param {number} timeout - Max time to wait for the server, in ms
+ * @param {Object|null} staleLock - Lock of a live PID whose endpoint refused connections
+ * @returns {Promise<Object>} Lock of the running server ({ pid, wsEndpoint, launchOptions })
+ */
+async function spawnSharedBrowserServer(options = {}, timeout = 30000, staleLock = null) {
+  const { spawn } = require('child_process');
+  const startLock = `${SHARED_BROWSER_LOCK}.starting`;
+  const deadline = Date.now() + timeout;
+  const usableLock = () => {
+    const lock = readSharedBrowserLock();
+    const isStale = lock && staleLock && lock.pid === staleLock.pid && lock.wsEndpoint === staleLock.wsEndpoint;
+    return isStale ? null : lock;
+  };
+
+  fs.mkdirSync(path.dirname(SHARED_BROWSER_LOCK), { recursive: true });
+
+  // Another process is starting the server - wait for its lockfile instead
+  while (!tryAcquireStartLock(startLock)) {
+    const lock = usableLock();
+    if (lock) {
+      return lock;
+    }
+    if (Date.now() >= deadline) {
+      throw new Error(`Shared browser server did not start within ${timeout}ms`);
+    }
+    await new Promise(resolve => setTimeout(resolve, 100));
+  }
+
+  try {
+    // A server may have come up while we were waiting for the start lock
+    const existing = usableLock();
+    if (existing) {
+      return existing;
+    }
+
+    // Only a dead server's lock (or one whose PID was reused) gets here
+    try {
+      fs.unlinkSync(SHARED_BROWSER_LOCK);
+    } catch (e) {
+      // No stale lockfile
+    }
+
+    const launchOptions = { ...getDefaultLaunchOptions(), ...options };
+    const child = spawn(
+      process.execPath,
+      [path.join(__dirname, 'browser-server.js'), SHARED_BROWSER_LOCK, JSON.stringify(launchOptions)],
+      { detached: true, stdio: 'ignore', cwd: path.join(__dirname, '..') }
+    );
+    let exited = false;
+    child.once('exit', () => { exited = true; });
+    child.unref();
+
+    while (Date.now() < deadline) {
+      const lock = usableLock();
+      if (lock) {
+        return lock;
+      }
+      if (exited) {
+        throw new Error('Shared browser server exited before it was ready');
+      }
+      await new Promise(resolve => setTimeout(resolve, 100));
+    }
+
+    throw new Error(`Shared browser server did not start within ${timeout}ms`);
+  } finally {
+    try {
+      fs.unlinkSync(startLock);
+    } catch (e) {
+      // Already removed
+    }
+  }
+}
+
+/**
+ * Connect to a Chromium instance shared across script runs, starting it if needed.
+ * Saves a full browser launch per run; each script should create its own context
+ * and call browser.close() when done, which disconnects without stopping the server.
+ * Launch options only apply when this call starts the server: if one is already
+ * running with different options (e.g. headless), a warning is printed and it is
+ * reused as-is - call closeSharedBrowser() first to relaunch. The server stops by
+ * itself after PW_SHARED_BROWSER_IDLE_MS (default 10 minutes) with no connected scripts.
+ * Uses PW_CDP_ENDPOINT (e.g. http://localhost:9222) instead when set.
+ * @param {Object} options - Launch options used if the server has to be started
+ * @returns {Promise<Object>} Connected browser
+ */
+async function connectSharedBrowser(options = {}) {
+  const { chromium } = require('playwright');
+
+  if (process.env.PW_CDP_ENDPOINT) {
+    return await chromium.connectOverCDP(process.env.PW_CDP_ENDPOINT);
+  }
+
+  let lock = readSharedBrowserLock();
+  let browser = null;
+  if (lock) {
+    try {
+      browser = await chromium.connect(lock.wsEndpoint);
+    } catch (e) {
+      // Stale lockfile (e.g. PID reused) - start a fresh server below
+    }
+  }
+
+  if (!browser) {
+    lock = await spawnSharedBrowserServer(options, 30000, lock);
+    browser = await chromium.connect(lock.wsEndpoint);
+  }
+
+  warnOnLaunchOptionMismatch(lock, options);
+  registerSharedBrowserClient(browser);
+  return browser;
+}
+
+/**
+ * Warn when requested launch options differ from those of the running server
+ * @param {Object} lock - Shared browser lock ({ launchOptions })
+ * @param {Object} options - Options passed to connectSharedBrowser()
+ */
+function warnOnLaunchOptionMismatch(lock, options) {
+  const running = lock.launchOptions || {};
+  const mismatched = Object.keys(options).filter(key =>
+    stableStringify(options[key]) !== stableStringify(running[key])
+  );
+
+  if (mismatched.length > 0) {
+    console.warn(
+      `⚠️  Shared browser already running with different ${mismatched.join(', ')}; ` +
+      'reusing it as-is. Call closeSharedBrowser() first to relaunch with new options.'
+    );
+  }
+}
+
+/**
+ * Register a connection with the shared browser server so it isn't stopped as idle
+ * @param {Object} browser - Browser connected to the shared server
+ */
+function registerSharedBrowserClient(browser) {
+  const clientsDir = getClientsDir(SHARED_BROWSER_LOCK);
+  const clientFile = path.join(clientsDir, `${process.pid}-${sharedBrowserClientCount++}`);
+
+  try {
+    fs.mkdirSync(clientsDir, { recursive: true });
+    fs.writeFileSync(clientFile, '');
+  } catch (e) {
+    // Best effort: an unregistered client only risks an earlier idle shutdown
+    return;
+  }
+
+  browser.once('disconnected', () => {
+    try {
+      fs.unlinkSync(clientFile);
+    } catch (e) {
+      // Already pruned by the server
+    }
+  });
+}
+
+/**
+ * Stop the shared browser server started by connectSharedBrowser()
+ * @returns {boolean} True if a running server was signalled
+ */
+function closeSharedBrowser() {
+  const lock = readSharedBrowserLock();
+  if (!lock) {
+    return false;
+  }
+
+  process.kill(lock.pid, 'SIGTERM');
+  return true;
 }
 
 /**
@@ -118,8 +435,8 @@ async function safeClick(page, selector, options = {}) {
   const maxRetries = options.retries || 3;
   const retryDelay = options.retryDelay || 1000;
   
-  for (let i = 0; i < maxRetries; i++) {
-    try {
+  try {
+    await retryWithBackoff(async () => {
       await page.waitForSelector(selector, { 
         state: 'visible',
         timeout: options.timeout || 5000 
@@ -128,15 +445,11 @@ async function safeClick(page, selector, options = {}) {
         force: options.force || false,
         timeout: options.timeout || 5000
       });
-      return true;
-    } catch (e) {
-      if (i === maxRetries - 1) {
-        console.error(`Failed to click ${selector} after ${maxRetries} attempts`);
-        throw e;
-      }
-      console.log(`Retry ${i + 1}/${maxRetries} for clicking ${selector}`);
-      await page.waitForTimeout(retryDelay);
-    }
+    }, maxRetries, retryDelay, options.maxDelay);
+    return true;
+  } catch (e) {
+    console.error(`Failed to click ${selector} after ${maxRetries} attempts`);
+    throw e;
   }
 }
 
@@ -148,20 +461,24 @@ async function safeClick(page, selector, options = {}) {
  * @param {Object} options - Type options
  */
 async function safeType(page, selector, text, options = {}) {
+  const timeout = options.timeout || 10000;
+
+  // fill() already waits for the field to be editable and replaces its value
+  if (!options.slow) {
+    await page.fill(selector, text, { timeout });
+    return;
+  }
+
   await page.waitForSelector(selector, { 
     state: 'visible',
-    timeout: options.timeout || 10000 
+    timeout 
   });
   
   if (options.clear !== false) {
     await page.fill(selector, '');
   }
   
-  if (options.slow) {
-    await page.type(selector, text, { delay: options.delay || 100 });
-  } else {
-    await page.fill(selector, text);
-  }
+  await page.type(selector, text, { delay: options.delay || 100 });
 }
 
 /**
@@ -171,9 +488,17 @@ async function safeType(page, selector, text, options = {}) {
  */
 async function extractTexts(page, selector) {
   await page.waitForSelector(selector, { timeout: 10000 });
-  return await page.$$eval(selector, elements => 
-    elements.map(el => el.textContent?.trim()).filter(Boolean)
-  );
+  // Single pass: trim and drop empty strings without an intermediate array
+  return await page.$$eval(selector, elements => {
+    const texts = [];
+    for (const el of elements) {
+      const text = el.textContent?.trim();
+      if (text) {
+        texts.push(text);
+      }
+    }
+    return texts;
+  });
 }
 
 /**
@@ -184,7 +509,9 @@ async function extractTexts(page, selector) {
  */
 async function takeScreenshot(page, name, options = {}) {
   const timestamp = new Date().toISOString().replace(/[:.]/g, '-');
-  const filename = `${name}-${timestamp}.png`;
+  // Counter keeps names unique when several screenshots land in the same millisecond
+  const sequence = String(screenshotCounter++).padStart(4, '0');
+  const filename = `${name}-${timestamp}-${sequence}.png`;
   
   await page.screenshot({
     path: filename,
@@ -203,29 +530,51 @@ async function takeScreenshot(page, name, options = {}) {
  * @param {Object} selectors - Login form selectors
  */
 async function authenticate(page, credentials, selectors = {}) {
-  const defaultSelectors = {
-    username: 'input[name="username"], input[name="email"], #username, #email',
-    password: 'input[name="password"], #password',
-    submit: 'button[type="submit"], input[type="submit"], button:has-text("Login"), button:has-text("Sign in")'
-  };
-  
-  const finalSelectors = { ...defaultSelectors, ...selectors };
+  const finalSelectors = { ...DEFAULT_AUTH_SELECTORS, ...selectors };
   
   await safeType(page, finalSelectors.username, credentials.username);
   await safeType(page, finalSelectors.password, credentials.password);
-  await safeClick(page, finalSelectors.submit);
-  
-  // Wait for navigation or success indicator
-  await Promise.race([
-    page.waitForNavigation({ waitUntil: 'networkidle' }),
+
+  // Start listening before submitting so a fast redirect isn't missed. Handlers are
+  // attached now so a signal timing out during a slow click isn't an unhandled rejection.
+  const loginDone = firstFulfilled([
+    page.waitForNavigation({ waitUntil: 'networkidle', timeout: 10000 }),
     page.waitForSelector(selectors.successIndicator || '.dashboard, .user-menu, .logout', { timeout: 10000 })
   ]).catch(() => {
     console.log('Login might have completed without navigation');
   });
+
+  await safeClick(page, finalSelectors.submit);
+  
+  // Wait for navigation or success indicator, whichever succeeds first
+  await loginDone;
+}
+
+/**
+ * Resolve with the first promise to fulfil; reject only if all of them reject
+ * @param {Array<Promise>} promises - Promises to wait on
+ * @returns {Promise} Value of the first fulfilled promise
+ */
+function firstFulfilled(promises) {
+  return new Promise((resolve, reject) => {
+    let rejected = 0;
+    promises.forEach(promise => {
+      promise.then(resolve, (error) => {
+        if (++rejected === promises.length) {
+          reject(error);
+        }
+      });
+    });
+  });
 }
 
 /**
  * Scroll page
+ * Up/down send mouse wheel events from the viewport centre, like a user would, so
+ * scroll handlers (e.g. infinite scroll) fire. The wheel scrolls whatever is under
+ * the centre: a scrollable element or modal there scrolls instead of the page, and
+ * pages that cancel wheel events don't scroll. Moving the pointer can also trigger
+ * hover effects. Top/bottom set the window scroll position directly.
  * @param {Object} page - Playwright page
  * @param {string} direction - 'down', 'up', 'top', 'bottom'
  * @param {number} distance - Pixels to scroll (for up/down)
@@ -233,11 +582,21 @@ async function authenticate(page, credentials, selectors = {}) {
 async function scrollPage(page, direction = 'down', distance = 500) {
   switch (direction) {
     case 'down':
-      await page.evaluate(d => window.scrollBy(0, d), distance);
-      break;
-    case 'up':
-      await page.evaluate(d => window.scrollBy(0, -d), distance);
+    case 'up': {
+      const delta = direction === 'down' ? distance : -distance;
+      const viewport = page.viewportSize();
+      if (viewport) {
+        // The wheel targets the element under the pointer, which may be left over
+        // a sidebar, modal or fixed header by earlier actions
+        await page.mouse.move(viewport.width / 2, viewport.height / 2);
+        await page.mouse.wheel(0, delta);
+      } else {
+        // No fixed viewport (viewport: null) to aim at
+        await page.evaluate(d => window.scrollBy(0, d), delta);
+      }
       break;
+    }
+    // No wheel/keyboard equivalent for absolute positions that doesn't depend on focus
     case 'top':
       await page.evaluate(() => window.scrollTo(0, 0));
       break;
@@ -254,12 +613,9 @@ async function scrollPage(page, direction = 'down', distance = 500) {
  * @param {string} tableSelector - Table selector
  */
 async function extractTableData(page, tableSelector) {
-  await page.waitForSelector(tableSelector);
-  
-  return await page.evaluate((selector) => {
-    const table = document.querySelector(selector);
-    if (!table) return null;
-    
+  // locator.evaluate() waits for the table itself, so no separate waitForSelector round-trip,
+  // and it accepts Playwright-only selectors that document.querySelector() would reject
+  return await page.locator(tableSelector).first().evaluate((table) => {
     const headers = Array.from(table.querySelectorAll('thead th')).map(th => 
       th.textContent?.trim()
     );
@@ -277,7 +633,7 @@ async function extractTableData(page, tableSelector) {
     });
     
     return { headers, rows };
-  }, tableSelector);
+  });
 }
 
 /**
@@ -286,33 +642,24 @@ async function extractTableData(page, tableSelector) {
  * @param {number} timeout - Max time to wait
  */
 async function handleCookieBanner(page, timeout = 3000) {
-  const commonSelectors = [
-    'button:has-text("Accept")',
-    'button:has-text("Accept all")',
-    'button:has-text("OK")',
-    'button:has-text("Got it")',
-    'button:has-text("I agree")',
-    '.cookie-accept',
-    '#cookie-accept',
-    '[data-testid="cookie-accept"]'
-  ];
-  
-  for (const selector of commonSelectors) {
-    try {
-      const element = await page.waitForSelector(selector, { 
-        timeout: timeout / commonSelectors.length,
-        state: 'visible'
-      });
-      if (element) {
-        await element.click();
+  try {
+    // One wait over all candidates, ignoring hidden matches
+    await page.locator(COOKIE_BANNER_SELECTOR).filter({ visible: true }).first()
+      .waitFor({ state: 'visible', timeout });
+
+    // Then click the most preferred visible candidate
+    for (const selector of COOKIE_BANNER_SELECTORS) {
+      const button = page.locator(selector).filter({ visible: true }).first();
+      if (await button.count() > 0) {
+        await button.click({ timeout });
         console.log('Cookie banner dismissed');
         return true;
       }
-    } catch (e) {
-      // Continue to next selector
     }
+  } catch (e) {
+    // No banner appeared, or it went away before it could be clicked
   }
-  
+
   return false;
 }
 
@@ -321,8 +668,9 @@ async function handleCookieBanner(page, timeout = 3000) {
  * @param {Function} fn - Function to retry
  * @param {number} maxRetries - Maximum retry attempts
  * @param {number} initialDelay - Initial delay in ms
+ * @param {number} maxDelay - Upper bound on the backoff delay in ms
  */
-async function retryWithBackoff(fn, maxRetries = 3, initialDelay = 1000) {
+async function retryWithBackoff(fn, maxRetries = 3, initialDelay = 1000, maxDelay = 30000) {
   let lastError;
   
   for (let i = 0; i < maxRetries; i++) {
@@ -330,7 +678,12 @@ async function retryWithBackoff(fn, maxRetries = 3, initialDelay = 1000) {
       return await fn();
     } catch (error) {
       lastError = error;
-      const delay = initialDelay * Math.pow(2, i);
+      if (i === maxRetries - 1) {
+        break;
+      }
+      // Up to 10% jitter so parallel scripts don't retry in lockstep
+      const backoff = Math.min(initialDelay * Math.pow(2, i), maxDelay);
+      const delay = Math.round(backoff + Math.random() * initialDelay * 0.1);
       console.log(`Attempt ${i + 1} failed, retrying in ${delay}ms...`);
       await new Promise(resolve => setTimeout(resolve, delay));
     }
@@ -345,76 +698,248 @@ async function retryWithBackoff(fn, maxRetries = 3, initialDelay = 1000) {
  * @param {Object} options - Context options
  */
 async function createContext(browser, options = {}) {
+  const contextOptions = { ...DEFAULT_CONTEXT_OPTIONS };
+  if (options.mobile) {
+    contextOptions.userAgent = MOBILE_USER_AGENT;
+  }
+  Object.assign(contextOptions, options);
+
+  // Environment headers apply underneath any passed in options
   const envHeaders = getExtraHeadersFromEnv();
+  if (envHeaders) {
+    contextOptions.extraHTTPHeaders = { ...envHeaders, ...options.extraHTTPHeaders };
+  }
 
-  // Merge environment headers with any passed in options
-  const mergedHeaders = {
-    ...envHeaders,
-    ...options.extraHTTPHeaders
-  };
+  // Function-valued options (e.g. logger) can't be compared by key, so never pool those
+  if (containsFunction(contextOptions)) {
+    return await browser.newContext(contextOptions);
+  }
 
-  const defaultOptions = {
-    viewport: { width: 1280, height: 720 },
-    userAgent: options.mobile
-      ? 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_7_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.2 Mobile/15E148 Safari/604.1'
-      : undefined,
-    permissions: options.permissions || [],
-    geolocation: options.geolocation,
-    locale: options.locale || 'en-US',
-    timezoneId: options.timezoneId || 'America/New_York',
-    // Only include extraHTTPHeaders if we have any
-    ...(Object.keys(mergedHeaders).length > 0 && { extraHTTPHeaders: mergedHeaders })
-  };
+  const poolKey = stableStringify(contextOptions);
+
+  // Reuse an idle context released with the same browser and options
+  for (let i = contextPool.length - 1; i >= 0; i--) {
+    const entry = contextPool[i];
+    if (entry.browser === browser && entry.key === poolKey) {
+      contextPool.splice(i, 1);
+      return entry.context;
+    }
+  }
+
+  const context = await browser.newContext(contextOptions);
+  contextPoolInfo.set(context, { key: poolKey, options: contextOptions });
+  context.once('close', () => {
+    const index = contextPool.findIndex(entry => entry.context === context);
+    if (index !== -1) {
+      contextPool.splice(index, 1);
+    }
+  });
 
-  return await browser.newContext({ ...defaultOptions, ...options });
+  return context;
 }
 
 /**
- * Detect running dev servers on common ports
- * @param {Array<number>} customPorts - Additional ports to check
- * @returns {Promise<Array>} Array of detected server URLs
+ * Return a context from createContext() to the pool instead of closing it.
+ * The next createContext() call with the same browser and options gets it back
+ * without creating a new context. Before pooling, the context is reset:
+ * - web storage and IndexedDB are cleared for the origins of its open pages
+ * - its pages are closed
+ * - routes are removed and cookies/permissions cleared
+ * - offline mode, extra headers and geolocation are restored to their creation values
+ * Init scripts, exposed bindings and storage of origins with no open page are NOT
+ * reset, so only release contexts that are safe to reuse as-is; close the others.
+ * Contexts created with function-valued options (e.g. logger) are never pooled and
+ * are simply closed. Pool size is set by PW_CONTEXT_POOL (default 4, 0 disables pooling).
+ * @param {Object} context - Browser context created by createContext()
+ */
+async function releaseContext(context) {
+  const browser = context.browser();
+
+  const poolInfo = contextPoolInfo.get(context);
+
+  if (CONTEXT_POOL_MAX <= 0 || !poolInfo || !browser || !browser.isConnected()) {
+    await context.close();
+    return;
+  }
+
+  await Promise.all(context.pages().map(async (page) => {
+    await page.evaluate(async () => {
+      localStorage.clear();
+      sessionStorage.clear();
+      if (indexedDB.databases) {
+        const databases = await indexedDB.databases();
+        databases.forEach(db => indexedDB.deleteDatabase(db.name));
+      }
+    }).catch(() => {
+      // about:blank and opaque origins have no storage to clear
+    });
+    await page.close();
+  }));
+
+  const { extraHTTPHeaders, geolocation } = poolInfo.options;
+  await context.unrouteAll({ behavior: 'ignoreErrors' });
+  await context.clearCookies();
+  await context.clearPermissions();
+  await context.setOffline(false);
+  await context.setExtraHTTPHeaders(extraHTTPHeaders || {});
+  await context.setGeolocation(geolocation || null);
+
+  contextPool.push({ browser, key: poolInfo.key, context });
+
+  // Evict the least recently released context
+  while (contextPool.length > CONTEXT_POOL_MAX) {
+    const evicted = contextPool.shift();
+    await evicted.context.close().catch(() => {});
+  }
+}
+
+/**
+ * Check whether a value or anything nested in it is a function
+ * @param {*} value - Value to inspect
+ * @returns {boolean} True if a function was found
+ */
+function containsFunction(value) {
+  if (typeof value === 'function') {
+    return true;
+  }
+  if (value && typeof value === 'object') {
+    return Object.values(value).some(containsFunction);
+  }
+  return false;
+}
+
+/**
+ * JSON.stringify with sorted object keys, for use as a cache key
+ * @param {*} value - Value to serialise
+ * @returns {string} Canonical JSON string
  */
-async function detectDevServers(customPorts = []) {
+function stableStringify(value) {
+  if (Array.isArray(value)) {
+    return `[${value.map(stableStringify).join(',')}]`;
+  }
+  if (value && typeof value === 'object') {
+    const keys = Object.keys(value).filter(key => value[key] !== undefined).sort();
+    return `{${keys.map(key => `${JSON.stringify(key)}:${stableStringify(value[key])}`).join(',')}}`;
+  }
+  return JSON.stringify(value);
+}
+
+/**
+ * Resolve localhost once per process
+ * @returns {Promise<Array<string>>} Distinct loopback addresses (e.g. 127.0.0.1 and ::1)
+ */
+function resolveLocalhost() {
+  if (!localhostAddresses) {
+    localhostAddresses = dns.promises.lookup('localhost', { all: true })
+      .then(results => [...new Set(results.map(result => result.address))])
+      .then(addresses => (addresses.length > 0 ? addresses : ['127.0.0.1']))
+      .catch(() => ['127.0.0.1']);
+  }
+  return localhostAddresses;
+}
+
+/**
+ * Check whether a port is accepting TCP connections
+ * @param {string} host - Address to connect to
+ * @param {number} port - Port to probe
+ * @param {number} timeout - Connect timeout in ms
+ * @returns {Promise<boolean>} True if the connection was accepted
+ */
+function probePort(host, port, timeout = 500) {
+  return new Promise((resolve) => {
+    const socket = net.createConnection({ host, port });
+    const finish = (open) => {
+      socket.destroy();
+      resolve(open);
+    };
+
+    socket.setTimeout(timeout, () => finish(false));
+    socket.once('connect', () => finish(true));
+    socket.once('error', () => finish(false));
+  });
+}
+
+/**
+ * Probe several local ports concurrently
+ * @param {Array<number>} ports - Ports to probe
+ * @param {number} timeout - Connect timeout in ms, shared by all probes
+ * @returns {Promise<Array<{port: number, address: string}>>} Open ports, in input order,
+ *   each with the loopback address that accepted the connection
+ */
+async function probePorts(ports, timeout = 500) {
+  // Dev servers may listen on IPv4 or IPv6 loopback only, so try every address
+  const addresses = await resolveLocalhost();
+  const results = await Promise.all(ports.map(async (port) => {
+    const open = await Promise.all(addresses.map(address => probePort(address, port, timeout)));
+    const index = open.indexOf(true);
+    return index === -1 ? null : { port, address: addresses[index] };
+  }));
+  return results.filter(Boolean);
+}
+
+/**
+ * Check that a local port answers HTTP without a server error
+ * @param {string} address - Loopback address the port accepted connections on
+ * @param {number} port - Port to request
+ * @param {number} timeout - Request timeout in ms
+ * @returns {Promise<boolean>} True if a HEAD / returned a status below 500
+ */
+function checkHttpStatus(address, port, timeout = 500) {
   const http = require('http');
 
-  // Common dev server ports
-  const commonPorts = [3000, 3001, 3002, 5173, 8080, 8000, 4200, 5000, 9000, 1234];
-  const allPorts = [...new Set([...commonPorts, ...customPorts])];
+  return new Promise((resolve) => {
+    const req = http.request({
+      // Connect to the address that was probed (localhost may resolve to the other
+      // family), but keep the Host header dev servers expect
+      host: address,
+      port: port,
+      path: '/',
+      method: 'HEAD',
+      headers: { Host: `localhost:${port}` },
+      timeout: timeout
+    }, (res) => {
+      res.resume();
+      resolve(res.statusCode < 500);
+    });
 
-  const detectedServers = [];
+    req.on('error', () => resolve(false));
+    req.on('timeout', () => {
+      req.destroy();
+      resolve(false);
+    });
+
+    req.end();
+  });
+}
+
+/**
+ * Detect running dev servers on common ports
+ * @param {Array<number>} customPorts - Additional ports to check
+ * @param {Object} options - Detection options
+ * @param {boolean} options.httpCheck - Also send a HEAD request to each open port and
+ *   skip servers that fail or answer with a 5xx status (slower, off by default)
+ * @returns {Promise<Array>} Array of detected server URLs
+ */
+async function detectDevServers(customPorts = [], options = {}) {
+  const allPorts = customPorts.length > 0
+    ? [...new Set([...COMMON_DEV_PORTS, ...customPorts])]
+    : COMMON_DEV_PORTS;
 
   console.log('🔍 Checking for running dev servers...');
 
-  for (const port of allPorts) {
-    try {
-      await new Promise((resolve, reject) => {
-        const req = http.request({
-          hostname: 'localhost',
-          port: port,
-          path: '/',
-          method: 'HEAD',
-          timeout: 500
-        }, (res) => {
-          if (res.statusCode < 500) {
-            detectedServers.push(`http://localhost:${port}`);
-            console.log(`  ✅ Found server on port ${port}`);
-          }
-          resolve();
-        });
-
-        req.on('error', () => resolve());
-        req.on('timeout', () => {
-          req.destroy();
-          resolve();
-        });
-
-        req.end();
-      });
-    } catch (e) {
-      // Port not available, continue
-    }
+  // Probe all ports concurrently so the scan takes one timeout window, not one per port
+  let openPorts = await probePorts(allPorts);
+
+  if (options.httpCheck) {
+    const healthy = await Promise.all(openPorts.map(({ address, port }) => checkHttpStatus(address, port)));
+    openPorts = openPorts.filter((open, i) => healthy[i]);
   }
 
+  const detectedServers = openPorts.map(({ port }) => {
+    console.log(`  ✅ Found server on port ${port}`);
+    return `http://localhost:${port}`;
+  });
+
   if (detectedServers.length === 0) {
     console.log('  ❌ No dev servers detected');
   }
@@ -424,6 +949,8 @@ async function detectDevServers(customPorts = []) {
 
 module.exports = {
   launchBrowser,
+  connectSharedBrowser,
+  closeSharedBrowser,
   createPage,
   waitForPageReady,
   safeClick,
@@ -436,6 +963,7 @@ module.exports = {
   handleCookieBanner,
   retryWithBackoff,
   createContext,
+  releaseContext,
   detectDevServers,
   getExtraHeadersFromEnv
 };
@@ -12,7 +12,7 @@
 
 const fs = require('fs');
 const path = require('path');
-const { execSync } = require('child_process');
+const Module = require('module');
 
 // Change to skill directory for proper module resolution
 process.chdir(__dirname);
@@ -34,6 +34,8 @@ function checkPlaywrightInstalled() {
  */
 function installPlaywright() {
   console.log('📦 Playwright not found. Installing...');
+  // Only needed on first run, so don't load child_process up front
+  const { execSync } = require('child_process');
   try {
     execSync('npm install', { stdio: 'inherit', cwd: __dirname });
     execSync('npx playwright install chromium', { stdio: 'inherit', cwd: __dirname });
@@ -80,45 +82,33 @@ function getCodeToExecute() {
   process.exit(1);
 }
 
+// Markers that show a script already has its own imports / async wrapper
+const STRUCTURE_PROBE = /(require\()|\(async \(\) => \{|\(async\(\)=>\{/g;
+
 /**
- * Clean up old temporary execution files from previous runs
+ * Detect require() and async IIFE markers in a single pass over the code
+ * @param {string} code - Script source
+ * @returns {{hasRequire: boolean, hasAsyncIIFE: boolean}}
  */
-function cleanupOldTempFiles() {
-  try {
-    const files = fs.readdirSync(__dirname);
-    const tempFiles = files.filter(f => f.startsWith('.temp-execution-') && f.endsWith('.js'));
-
-    if (tempFiles.length > 0) {
-      tempFiles.forEach(file => {
-        const filePath = path.join(__dirname, file);
-        try {
-          fs.unlinkSync(filePath);
-        } catch (e) {
-          // Ignore errors - file might be in use or already deleted
-        }
-      });
+function detectCodeStructure(code) {
+  let hasRequire = false;
+  let hasAsyncIIFE = false;
+
+  STRUCTURE_PROBE.lastIndex = 0;
+  let match;
+  while (!(hasRequire && hasAsyncIIFE) && (match = STRUCTURE_PROBE.exec(code)) !== null) {
+    if (match[1]) {
+      hasRequire = true;
+    } else {
+      hasAsyncIIFE = true;
     }
-  } catch (e) {
-    // Ignore directory read errors
   }
-}
-
-/**
- * Wrap code in async IIFE if not already wrapped
- */
-function wrapCodeIfNeeded(code) {
-  // Check if code already has require() and async structure
-  const hasRequire = code.includes('require(');
-  const hasAsyncIIFE = code.includes('(async () => {') || code.includes('(async()=>{');
 
-  // If it's already a complete script, return as-is
-  if (hasRequire && hasAsyncIIFE) {
-    return code;
-  }
+  return { hasRequire, hasAsyncIIFE };
+}
 
-  // If it's just Playwright commands, wrap in full template
-  if (!hasRequire) {
-    return `
+// Prelude for bare Playwright commands: imports, helpers and header utilities
+const PLAYWRIGHT_PRELUDE = `
 const { chromium, firefox, webkit, devices } = require('playwright');
 const helpers = require('./lib/helpers');
 
@@ -141,10 +131,16 @@ function getContextOptionsWithHeaders(options = {}) {
     }
   };
 }
+`;
 
+// Async IIFE with error reporting; user code is spliced in between start and end.
+// The code is not re-indented: that would alter multi-line template literals.
+const ASYNC_WRAPPER_START = `
 (async () => {
   try {
-    ${code}
+`;
+
+const ASYNC_WRAPPER_END = `
   } catch (error) {
     console.error('❌ Automation error:', error.message);
     if (error.stack) {
@@ -154,37 +150,51 @@ function getContextOptionsWithHeaders(options = {}) {
   }
 })();
 `;
+
+/**
+ * Wrap code in async IIFE if not already wrapped
+ */
+function wrapCodeIfNeeded(code) {
+  // Check if code already has require() and async structure
+  const { hasRequire, hasAsyncIIFE } = detectCodeStructure(code);
+
+  // If it's just Playwright commands, wrap in full template
+  if (!hasRequire) {
+    return PLAYWRIGHT_PRELUDE + ASYNC_WRAPPER_START + code + ASYNC_WRAPPER_END;
   }
 
   // If has require but no async wrapper
   if (!hasAsyncIIFE) {
-    return `
-(async () => {
-  try {
-    ${code}
-  } catch (error) {
-    console.error('❌ Automation error:', error.message);
-    if (error.stack) {
-      console.error(error.stack);
-    }
-    process.exit(1);
-  }
-})();
-`;
+    return ASYNC_WRAPPER_START + code + ASYNC_WRAPPER_END;
   }
 
+  // Already a complete script, return as-is
   return code;
 }
 
+/**
+ * Execute code in-process as a CommonJS module in the skill directory
+ * @param {string} code - Complete script source
+ */
+function executeCode(code) {
+  // Virtual filename: never written to disk, but anchors require() resolution
+  // and shows up in stack traces
+  const filename = path.join(__dirname, '.inline-execution.js');
+
+  // A real Module gives the same semantics as require() of a file: shebang lines,
+  // dynamic import(), exact stack trace line numbers and a proper module object
+  const scriptModule = new Module(filename, module);
+  scriptModule.filename = filename;
+  scriptModule.paths = Module._nodeModulePaths(__dirname);
+  scriptModule._compile(code, filename);
+}
+
 /**
  * Main execution
  */
 async function main() {
   console.log('🎭 Playwright Skill - Universal Executor\n');
 
-  // Clean up old temp files from previous runs
-  cleanupOldTempFiles();
-
   // Check Playwright installation
   if (!checkPlaywrightInstalled()) {
     const installed = installPlaywright();
@@ -197,20 +207,10 @@ async function main() {
   const rawCode = getCodeToExecute();
   const code = wrapCodeIfNeeded(rawCode);
 
-  // Create temporary file for execution
-  const tempFile = path.join(__dirname, `.temp-execution-${Date.now()}.js`);
-
   try {
-    // Write code to temp file
-    fs.writeFileSync(tempFile, code, 'utf8');
-
-    // Execute the code
+    // Execute the code in-process - no temp file round-trip
     console.log('🚀 Starting automation...\n');
-    require(tempFile);
-
-    // Note: Temp file will be cleaned up on next run
-    // This allows long-running async operations to complete safely
-
+    executeCode(code);
   } catch (error) {
     console.error('❌ Execution failed:', error.message);
     if (error.stack) {